@@ -27,9 +27,7 @@ from collections import namedtuple
 import dependency_injector.containers as containers
 import dependency_injector.providers as providers
 
-from mlstudio.data_services.preprocessing import RegressionDataProcessor
-from mlstudio.data_services.preprocessing import BinaryClassDataProcessor
-from mlstudio.data_services.preprocessing import MultiClassDataProcessor
+from mlstudio.factories.data import DataProcessors
 from mlstudio.supervised.algorithms.optimization import gradient_descent
 from mlstudio.supervised.algorithms.optimization.observers import debug, early_stop
 from mlstudio.supervised.algorithms.optimization.observers import learning_rate
@@ -39,8 +37,6 @@ from mlstudio.supervised.algorithms.optimization.services import optimizers, reg
 from mlstudio.supervised.algorithms.optimization.services import tasks, loss
 from mlstudio.supervised.algorithms.optimization.services import activations
 from mlstudio.supervised.metrics import regression, binaryclass, multiclass
-from mlstudio.utils.data_manager import AddBiasTerm, OneHotLabelEncoder, LabelEncoder
-from mlstudio.utils.data_manager import LabelEncoder, DataSplitter
 from mlstudio.utils.print import Printer
 
 
@@ -59,10 +55,7 @@ class GradientDescent(containers.DeclarativeContainer):
             batch_size=None,
             val_size=0.3,
             loss=loss.Quadratic(),
-            data_processor = RegressionDataProcessor(add_bias_transformer=AddBiasTerm(),
-                    split_transformer=DataSplitter(),
-                    one_hot_label_encoder=OneHotLabelEncoder(),
-                    label_encoder=LabelEncoder()),
+            data_processor = DataProcessors.regression,
             activation = None,
             theta_init=None,
             optimizer=optimizers.GradientDescentOptimizer(),                                    
@@ -85,10 +78,7 @@ class GradientDescent(containers.DeclarativeContainer):
             batch_size=None,
             val_size=0.3,
             loss=loss.CrossEntropy(),
-            data_processor = BinaryClassDataProcessor(add_bias_transformer=AddBiasTerm(),
-                    split_transformer=DataSplitter(),
-                    one_hot_label_encoder=OneHotLabelEncoder(),
-                    label_encoder=LabelEncoder()),
+            data_processor = DataProcessors.binaryclass,
             activation = activations.Sigmoid(),
             theta_init=None,
             optimizer=optimizers.GradientDescentOptimizer(),                                    
@@ -111,10 +101,7 @@ class GradientDescent(containers.DeclarativeContainer):
             batch_size=None,
             val_size=0.3,
             loss=loss.CategoricalCrossEntropy(),
-            data_processor = MultiClassDataProcessor(add_bias_transformer=AddBiasTerm(),
-                    split_transformer=DataSplitter(),
-                    one_hot_label_encoder=OneHotLabelEncoder(),
-                    label_encoder=LabelEncoder()),
+            data_processor = DataProcessors.multiclass,
             activation = activations.Softmax(),
             theta_init=None,
             optimizer=optimizers.GradientDescentOptimizer(),                                    
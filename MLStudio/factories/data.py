@@ -35,18 +35,29 @@ class DataProcessors(containers.DeclarativeContainer):
     from mlstudio.data_services.preprocessing import BinaryClassDataProcessor
     from mlstudio.data_services.preprocessing import MultiClassDataProcessor
 
+    # Transformers are built on demand rather than at import time. Stateless
+    # transformers are shared; encoders hold fitted state, so each data
+    # processor receives its own.
+    add_bias_transformer = providers.Singleton(data_manager.AddBiasTerm)
+    split_transformer = providers.Singleton(data_manager.DataSplitter)
+    label_encoder = providers.Factory(data_manager.LabelEncoder)
+    one_hot_label_encoder = providers.Factory(data_manager.OneHotLabelEncoder)
+
     regression = providers.Factory(RegressionDataProcessor,
-                                   add_bias_transformer=data_manager.AddBiasTerm(),
-                                   split_transformer=data_manager.DataSplitter())
+                                   add_bias_transformer=add_bias_transformer,
+                                   split_transformer=split_transformer,
+                                   label_encoder=label_encoder,
+                                   one_hot_label_encoder=one_hot_label_encoder)
 
     binaryclass = providers.Factory(BinaryClassDataProcessor,
-                                   add_bias_transformer=data_manager.AddBiasTerm(),
-                                   split_transformer=data_manager.DataSplitter(),
-                                   label_encoder=data_manager.LabelEncoder())                                   
+                                   add_bias_transformer=add_bias_transformer,
+                                   split_transformer=split_transformer,
+                                   label_encoder=label_encoder,
+                                   one_hot_label_encoder=one_hot_label_encoder)
 
     multiclass = providers.Factory(MultiClassDataProcessor,
-                                   add_bias_transformer=data_manager.AddBiasTerm(),
-                                   split_transformer=data_manager.DataSplitter(),
-                                   label_encoder=data_manager.LabelEncoder(),
-                                   one_hot_label_encoder=data_manager.OneHotLabelEncoder())                                   
+                                   add_bias_transformer=add_bias_transformer,
+                                   split_transformer=split_transformer,
+                                   label_encoder=label_encoder,
+                                   one_hot_label_encoder=one_hot_label_encoder)                                   
 
@@ -43,22 +43,22 @@ class RegressionTasks(containers.DeclarativeContainer):
 
     base = providers.Factory(tasks.LinearRegression,
                                           loss=loss.Quadratic(),
-                                          data_processor=DataProcessors.regression(),
+                                          data_processor=DataProcessors.regression,
                                           activation=None)
 
     lasso = providers.Factory(tasks.LinearRegression,
                                           loss=loss.Quadratic(regularizer=L1_regularizer),
-                                          data_processor=DataProcessors.regression(),    
+                                          data_processor=DataProcessors.regression,    
                                           activation=None)                                      
 
     ridge = providers.Factory(tasks.LinearRegression,
                                           loss=loss.Quadratic(regularizer=regularizers.L2(alpha=0.01)),
-                                          data_processor=DataProcessors.regression(),
+                                          data_processor=DataProcessors.regression,
                                           activation=None)                           
 
     elasticnet = providers.Factory(tasks.LinearRegression,
                                           loss=loss.Quadratic(regularizer=regularizers.L1_L2(alpha=0.01, ratio=0.5)),
-                                          data_processor=DataProcessors.regression(),
+                                          data_processor=DataProcessors.regression,
                                           activation=None)                                                         
 
 # --------------------------------------------------------------------------- #
@@ -67,22 +67,22 @@ class BinaryclassTasks(containers.DeclarativeContainer):
 
     base = providers.Factory(tasks.BinaryClassification,
                                           loss=loss.CrossEntropy(),
-                                          data_processor=DataProcessors.binaryclass(),
+                                          data_processor=DataProcessors.binaryclass,
                                           activation=activations.Sigmoid())     
 
     lasso = providers.Factory(tasks.BinaryClassification,                                          
                                           loss=loss.CrossEntropy(regularizer=regularizers.L1(alpha=0.01)),
-                                          data_processor=DataProcessors.binaryclass(),
+                                          data_processor=DataProcessors.binaryclass,
                                           activation=activations.Sigmoid())       
 
     ridge = providers.Factory(tasks.BinaryClassification,                                          
                                           loss=loss.CrossEntropy(regularizer=regularizers.L2(alpha=0.01)),
-                                          data_processor=DataProcessors.binaryclass(),
+                                          data_processor=DataProcessors.binaryclass,
                                           activation=activations.Sigmoid())              
 
     elasticnet = providers.Factory(tasks.BinaryClassification,                                          
                                           loss=loss.CrossEntropy(regularizer=regularizers.L1_L2(alpha=0.01, ratio=0.5)),
-                                          data_processor=DataProcessors.binaryclass(),
+                                          data_processor=DataProcessors.binaryclass,
                                           activation=activations.Sigmoid())                                                                                                                                   
 
 # --------------------------------------------------------------------------- #
@@ -91,21 +91,21 @@ class MulticlassTasks(containers.DeclarativeContainer):
 
     base = providers.Factory(tasks.MultiClassification,
                                           loss=loss.CategoricalCrossEntropy(),
-                                          data_processor=DataProcessors.multiclass(),
+                                          data_processor=DataProcessors.multiclass,
                                           activation=activations.Softmax())
 
     lasso = providers.Factory(tasks.MultiClassification,
                                           loss=loss.CategoricalCrossEntropy(regularizer=regularizers.L1(alpha=0.01)),
-                                          data_processor=DataProcessors.multiclass(),
+                                          data_processor=DataProcessors.multiclass,
                                           activation=activations.Softmax())                                          
 
     ridge = providers.Factory(tasks.MultiClassification,
                                           loss=loss.CategoricalCrossEntropy(regularizer=regularizers.L2(alpha=0.01)),
-                                          data_processor=DataProcessors.multiclass(),
+                                          data_processor=DataProcessors.multiclass,
                                           activation=activations.Softmax())                                                                                    
 
     elasticnet = providers.Factory(tasks.MultiClassification,
                                           loss=loss.CategoricalCrossEntropy(regularizer=regularizers.L1_L2(alpha=0.01, ratio=0.5)),
-                                          data_processor=DataProcessors.multiclass(),
+                                          data_processor=DataProcessors.multiclass,
                                           activation=activations.Softmax())                                                                                                                              
 
@@ -22,7 +22,6 @@
 """Data manipulation functions."""
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from math import ceil
 import sys
 import warnings
 
@@ -36,17 +35,26 @@ from sklearn import preprocessing
 
 from mlstudio.utils.data_analyzer import get_features, get_target_info
 from mlstudio.utils.validation import check_X_y, check_X, check_is_fitted
+from mlstudio.utils.validation import is_one_hot
 # --------------------------------------------------------------------------- #
 #                           DATA PREPARATION                                  #
 # --------------------------------------------------------------------------- #
 def hot_to_cool(y):
     """Converts one-hot vectors to an array of integers."""        
-    y = np.array(y)
-    if y.ndim > 1:
-        if np.sum(y) == len(y):
-            y = np.argmax(y, axis=1)
+    y = np.asarray(y)
+    if y.ndim > 1 and y.shape[1] > 1 and is_one_hot(y):
+        y = np.argmax(y, axis=1)
     return y
 
+def float_dtype(X, dtype=None):
+    """Returns dtype if given, else X's floating dtype, else float64."""
+    if dtype is not None:
+        return np.dtype(dtype)
+    X_dtype = getattr(X, 'dtype', None)
+    if X_dtype is not None and np.issubdtype(X_dtype, np.floating):
+        return X_dtype
+    return np.dtype(float)
+
 def coo_to_csr(X):
     """Converts coo matrices to csr format."""
     if issparse(X):
@@ -132,7 +140,7 @@ class NormScaler(BaseTransformer):
         -------
         Xt : array-like of same shape as X
         """
-        X = np.divide(X, self.r_) * self.clip_norm               
+        X = X * (self.clip_norm / self.r_)
         return X
 
     def fit_transform(self, X):
@@ -163,7 +171,7 @@ class NormScaler(BaseTransformer):
         array-like of same shape as X, with data returned to original
         un-standardized values.
         """
-        X = X * self.r_ / self.clip_norm    
+        X = X * (self.r_ / self.clip_norm)
         return X
 # --------------------------------------------------------------------------- #
 
@@ -176,6 +184,12 @@ class MinMaxScaler(BaseTransformer):
 
     Note: Works for dense matrices only.
 
+    Parameters
+    ----------
+    dtype : numpy dtype, optional (default=None)
+        The dtype of the transformed data. If None, floating point input
+        keeps its dtype (e.g. float32) and other input is returned as float64.
+
     Attributes
     ----------
     data_min_ : ndarray, shape (n_features)
@@ -189,7 +203,8 @@ class MinMaxScaler(BaseTransformer):
 
     """        
 
-    def __init__(self):        
+    def __init__(self, dtype=None):
+        self.dtype = dtype
         self._is_fitted = False
 
     @property
@@ -226,11 +241,14 @@ class MinMaxScaler(BaseTransformer):
         -------
         Xt : array-like of same shape as X
         """
-        X = X - self.data_min_
-        X = np.divide(X, self.data_range_, 
-                      out = np.zeros(X.shape,dtype=float), 
-                      where = self.data_range_ != 0)        
-        return X
+        # Subtract into a single float output and divide it in place.
+        nonzero = self.data_range_ != 0
+        Xt = np.subtract(X, self.data_min_, dtype=float_dtype(X, self.dtype))
+        np.divide(Xt, self.data_range_, out=Xt, where=nonzero)
+        # Features with zero range map to zero.
+        if not np.all(nonzero):
+            Xt[..., ~nonzero] = 0
+        return Xt
 
     def fit_transform(self, X):
         """Combines fit and transform methods.
@@ -282,6 +300,10 @@ class StandardScaler(BaseTransformer):
     scale : Bool, optional (default=True)
         If True, scale the data to a unit variance.
 
+    dtype : numpy dtype, optional (default=None)
+        The dtype of the transformed data. If None, floating point input
+        keeps its dtype (e.g. float32) and other input is returned as float64.
+
     Attributes
     ----------
     mean_ : array-like, shape (n_features)
@@ -290,14 +312,19 @@ class StandardScaler(BaseTransformer):
 
     std_ : array-like, shape (n_features)
         The standard deviation for each feature in the training set.
-        Equal to one if 'scale=False'.
+        Equal to one if 'scale=False' or if the feature is constant.
+
+    inv_std_ : array-like, shape (n_features)
+        The reciprocal of std_, used to scale the data.
     """        
 
-    def __init__(self, center=True, scale_std=True):
+    def __init__(self, center=True, scale_std=True, dtype=None):
         self.center = center
         self.scale_std = scale_std
+        self.dtype = dtype
         self.mean_=0
         self.std_=1
+        self.inv_std_=1
         self._is_fitted = False
 
     @property
@@ -320,8 +347,11 @@ class StandardScaler(BaseTransformer):
             self.mean_ = np.mean(X,axis=0)
         if self.scale_std:
             self.std_ = np.std(X,axis=0)
+            # Constant features are left unscaled rather than divided by zero.
+            self.std_ = np.where(self.std_ == 0, 1.0, self.std_)
         else:
             self.std_ = np.ones(shape=(X.shape[1],))            
+        self.inv_std_ = 1.0 / self.std_
         self._is_fitted = True
         return self
 
@@ -337,7 +367,8 @@ class StandardScaler(BaseTransformer):
         -------
         array-like of same shape as X, centered and scaled
         """
-        z = (X-self.mean_)/self.std_
+        z = np.subtract(X, self.mean_, dtype=float_dtype(X, self.dtype))
+        z *= self.inv_std_
         return z
 
     def inverse_transform(self, X):
@@ -417,7 +448,16 @@ class LabelEncoder(BaseTransformer):
         return self._encoder.inverse_transform(y)
 # --------------------------------------------------------------------------- #
 class OneHotLabelEncoder(BaseTransformer):
-    """Converts labels to k class One Hot encoding."""
+    """Converts labels to k class One Hot encoding.
+
+    Attributes
+    ----------
+    classes_ : ndarray of shape (n_classes,)
+        Holds the label for each class.
+
+    n_classes_ : int
+        The number of classes seen during fit.
+    """
 
     def __init__(self, negative=0, positive=1, sparse_output=False):
         self.negative = negative
@@ -443,6 +483,8 @@ class OneHotLabelEncoder(BaseTransformer):
                                                   pos_label=self.positive,
                                                   sparse_output=self.sparse_output)
         self._encoder.fit(y)
+        self.classes_ = self._encoder.classes_
+        self.n_classes_ = len(self.classes_)
         self._is_fitted = True
         return self
 
@@ -515,10 +557,11 @@ class GradientScaler(BaseTransformer, TransformerMixin):
 
     def transform(self, X):
         """Transforms the data."""                
+        # Fold the threshold ratio into one scalar so X is traversed once.
         if self._r < self.lower_threshold:
-            X = X  * self.lower_threshold / self._r                        
+            X = X * (self.lower_threshold / self._r)
         elif self._r > self.upper_threshold:
-            X = X  * self.upper_threshold / self._r            
+            X = X * (self.upper_threshold / self._r)
         return X
             
     def fit_transform(self, X):
@@ -529,9 +572,9 @@ class GradientScaler(BaseTransformer, TransformerMixin):
     def inverse_transform(self, X):
         """Apply the inverse transformation."""
         if self._r < self.lower_threshold:
-            X = X  * self._r / self.lower_threshold                         
+            X = X * (self._r / self.lower_threshold)
         elif self._r > self.upper_threshold:
-            X = X  * self._r / self.upper_threshold                    
+            X = X * (self._r / self.upper_threshold)
         return X
 
 class AddBiasTerm(BaseTransformer, TransformerMixin):
@@ -551,16 +594,18 @@ class AddBiasTerm(BaseTransformer, TransformerMixin):
 
     def _transform_numpy(self, X):
         """Adds bias term to numpy matrix."""
-        return np.insert(X, 0, 1.0, axis=1)
+        n_samples, n_features = X.shape
+        Xt = np.empty((n_samples, n_features + 1), dtype=X.dtype)
+        Xt[:, 0] = 1.0
+        Xt[:, 1:] = X
+        return Xt
     
     def _transform_csr(self, X):
         """Adds bias term to csr matrix."""
         X = coo_to_csr(X)
         ones = np.ones((X.shape[0],1))
         bias_term = csr_matrix(ones, dtype=float)
-        X = hstack((bias_term, X)) 
-        X = coo_to_csr(X)
-        return X
+        return hstack((bias_term, X), format='csr')
 
     def transform(self, X, y=None):
         """Adds bias term to matrix and returns it to the caller."""
@@ -573,7 +618,9 @@ class AddBiasTerm(BaseTransformer, TransformerMixin):
     
     def inverse_transform(self, X):
         """Removes bias term from matrix and returns it to caller."""
-        X = coo_to_csr(X)
+        # COO does not support slicing. Dense input is returned as a view.
+        if isspmatrix_coo(X):
+            X = X.tocsr()
         return X[:,1:]
 
     def fit_transform(self, X):
@@ -600,7 +647,7 @@ class ZeroBiasTerm(BaseTransformer, TransformerMixin):
         if np.ndim(X) == 1:
             X[0] = 0
         else:
-            X[0,:] = np.zeros(shape=X.shape[1])
+            X[0,:] = 0
         return X
            
 # --------------------------------------------------------------------------- #
@@ -648,11 +695,7 @@ class DataShuffler(BaseTransformer, TransformerMixin):
         X, y    : Inputs and target data         
         
         """
-        rg = np.random.default_rng(seed=random_state)
-        X = rg.permutation(X)   
-        if y is not None:
-            y = rg.permutation(y)    
-        return X, y
+        return shuffle_data(X, y, random_state=random_state)
 
     def fit_transform(self, X, y=None, random_state=None):
         """Executes fit and transform in sequence."""
@@ -711,39 +754,11 @@ class DataSplitter(BaseTransformer, TransformerMixin):
         """ 
         X = X.tocsr() if isspmatrix_coo(X) else check_X(X)
         y = y.tocsr() if isspmatrix_coo(y) else hot_to_cool(y)
-            
-        if X.shape[0] != y.shape[0]:
-            raise ValueError("X and y have incompatible shapes. Expected "
-                            "X.shape[0]=y.shape[0] however X.shape[0] = %d "
-                            " and y.shape[0] = %d." % (X.shape[0], y.shape[0]))
-
-        if not stratify:
-            split_i = len(y) - int(len(y) // (1 / test_size))
-            X_train, X_test = X[:split_i], X[split_i:]
-            y_train, y_test = y[:split_i], y[split_i:]
-        else:
-            train_idx = []
-            test_idx = []
-            classes = np.unique(y)
-            for k in classes:
-                # Obtain the indices and number of samples for class k
-                idx_k = np.array(np.where(y == k)).flatten()  
-                n_samples_k = idx_k.shape[0]
-                # Compute number of training and test samples
-                n_train_samples_k = ceil(n_samples_k * (1-test_size))
-                n_test_samples_k = n_samples_k - n_train_samples_k
-                # Allocate corresponding indices to training and test set indices
-                train_idx_k = idx_k[0:n_train_samples_k]
-                test_idx_k = idx_k[n_train_samples_k:n_train_samples_k+n_test_samples_k]
-                # Maintain indices in a list
-                train_idx.append(train_idx_k)
-                test_idx.append(test_idx_k)
-            # Concatenate all indices into a training and test indices
-            train_idx = np.concatenate(train_idx).ravel()
-            test_idx = np.concatenate(test_idx).ravel()
-            # Slice and dice.
-            y_train, y_test = y[train_idx], y[test_idx]
-            X_train, X_test = X[train_idx], X[test_idx]
+
+        X_train, X_test, y_train, y_test = data_split(X, y,
+                                                      test_size=test_size,
+                                                      stratify=stratify,
+                                                      random_state=random_state)
 
         if X_train.shape[0] == 0 or X_test.shape[0] == 0:
             msg = "Train test split resulted in a dataset with zero samples. Returning original data."
@@ -757,7 +772,7 @@ class DataSplitter(BaseTransformer, TransformerMixin):
 
 
 
-def shuffle_data(X, y=None, random_state=None):
+def shuffle_data(X, y=None, random_state=None, rng=None):
     """ Random shuffle of the samples in X and y.
     
     Shuffles data
@@ -770,21 +785,34 @@ def shuffle_data(X, y=None, random_state=None):
     y : array_like of shape (m,)
         Target data    
 
+    random_state : int, optional (default=None)
+        Seed for reproducibility of pseudo-randomization
+
+    rng : numpy.random.Generator, optional (default=None)
+        Generator to draw from. Supplying one lets repeated calls share a
+        single generator rather than seeding a new one each time. If given,
+        random_state is ignored.
+
     Returns
     -------
     Shuffled X, and y
     
     """    
-    rg = np.random.default_rng(seed=random_state)
-    X = rg.permutation(X)   
+    if not issparse(X):
+        X = np.asarray(X)
+    if y is not None and not issparse(y):
+        y = np.asarray(y)
+    rg = rng if rng is not None else np.random.default_rng(seed=random_state)
+    perm = rg.permutation(X.shape[0])
+    X = X[perm]
     if y is not None:
-        y = rg.permutation(y)    
+        y = y[perm]
     return X, y
 
 # --------------------------------------------------------------------------- #
 #                              SAMPLE                                         #
 # --------------------------------------------------------------------------- #    
-def sampler(X, y, size=1, replace=True, random_state=None):
+def sampler(X, y, size=1, replace=True, random_state=None, rng=None):
     """Generates a random sample of a given size from a data set.
 
         Parameters
@@ -803,22 +831,38 @@ def sampler(X, y, size=1, replace=True, random_state=None):
 
     random_state : int
         random_state for reproducibility
+
+    rng : numpy.random.Generator, optional (default=None)
+        Generator to draw from. If given, random_state is ignored.
     
     Returns
     -------
     X, y    : Random samples from data sets X, and y of the designated size.
 
     """
-    import numpy as np
-
+    rg = rng if rng is not None else np.random.default_rng(seed=random_state)
     nobs = X.shape[0]
-    idx = np.random.choice(a=nobs, size=size, replace=True)
+    if replace:
+        idx = rg.integers(low=0, high=nobs, size=size)
+    else:
+        idx = rg.choice(nobs, size=size, replace=False)
     return X[idx], y[idx]
 
 # --------------------------------------------------------------------------- #
 #                            SPLIT DATA                                       #
 # --------------------------------------------------------------------------- #
-def data_split(X, y, test_size=0.3, stratify=False, random_state=None):
+def _n_test_samples(n_samples, test_size):
+    """Returns the number of test samples, floor(n_samples * test_size).
+
+    The product is rounded to 6 decimals before the floor so that float
+    error, e.g. 10 * 0.7 = 7.000000000000001 or 100 * 0.29 = 28.999999999999996,
+    does not move a sample between the training and test sets. Equivalent
+    to n_samples - ceil(n_samples * (1 - test_size)) in exact arithmetic.
+    """
+    return np.floor(np.round(np.multiply(n_samples, test_size), 6)).astype(np.intp)
+
+def data_split(X, y, test_size=0.3, stratify=False, random_state=None,
+               shuffle=False, return_classes=False, rng=None):
     """ Split the data into train and test sets 
     
     Splits inputs X, and y into training and test sets of proportions
@@ -835,15 +879,24 @@ def data_split(X, y, test_size=0.3, stratify=False, random_state=None):
     test_size : float, optional (default=0.3)
         The proportion of X, and y to be designated to the test set.
 
-    shuffle : bool, optional (default=True)
-        Bool indicating whether the data should be shuffled prior to split.
-
     stratify : bool, optional (default=False)
         If True, stratified sampling is performed. 
 
     random_state : int, optional (default=None)
         Random state variable
 
+    shuffle : bool, optional (default=False)
+        Bool indicating whether the data should be shuffled prior to split.
+        A single permutation is applied to both X and y.
+
+    return_classes : bool, optional (default=False)
+        If True, the sorted unique classes in y are returned as a fifth
+        element. The stratified split obtains them from its own sort of y,
+        sparing callers a second pass with np.unique.
+
+    rng : numpy.random.Generator, optional (default=None)
+        Generator used to shuffle the data. If given, random_state is ignored.
+
     Returns
     -------
     X_train : array-like
@@ -857,6 +910,9 @@ def data_split(X, y, test_size=0.3, stratify=False, random_state=None):
 
     y_test : array_like
         Targets for X_test 
+
+    classes : array-like
+        The unique classes in y. Only returned if return_classes is True.
     """
     if isspmatrix_coo(X):
         X = X.tocsr()
@@ -868,37 +924,45 @@ def data_split(X, y, test_size=0.3, stratify=False, random_state=None):
                          "X.shape[0]=y.shape[0] however X.shape[0] = %d "
                          " and y.shape[0] = %d." % (X.shape[0], y.shape[0]))
 
+    if shuffle:
+        rg = rng if rng is not None else np.random.default_rng(seed=random_state)
+        perm = rg.permutation(X.shape[0])
+        X, y = X[perm], y[perm]
+
     if not stratify:
-        split_i = len(y) - int(len(y) // (1 / test_size))
+        split_i = X.shape[0] - int(_n_test_samples(X.shape[0], test_size))
         X_train, X_test = X[:split_i], X[split_i:]
         y_train, y_test = y[:split_i], y[split_i:]
     else:
-        train_idx = []
-        test_idx = []
-        classes = np.unique(y)
-        for k in classes:
-            # Obtain the indices and number of samples for class k
-            idx_k = np.array(np.where(y == k)).flatten()  
-            n_samples_k = idx_k.shape[0]
-            # Compute number of training and test samples
-            n_train_samples_k = ceil(n_samples_k * (1-test_size))
-            n_test_samples_k = n_samples_k - n_train_samples_k
-            # Allocate corresponding indices to training and test set indices
-            train_idx_k = idx_k[0:n_train_samples_k]
-            test_idx_k = idx_k[n_train_samples_k:n_train_samples_k+n_test_samples_k]
-            # Maintain indices in a list
-            train_idx.append(train_idx_k)
-            test_idx.append(test_idx_k)
-        # Concatenate all indices into a training and test indices
-        train_idx = np.concatenate(train_idx).ravel()
-        test_idx = np.concatenate(test_idx).ravel()
+        # Group the sample indices by class with a single stable sort of y.
+        # Within each class, the indices remain in their original order.
+        sorted_idx = np.argsort(y, kind='stable')
+        y_sorted = y[sorted_idx]
+        offsets = np.flatnonzero(y_sorted[1:] != y_sorted[:-1]) + 1
+        offsets = np.concatenate(([0], offsets, [len(y)]))
+        # Compute number of training samples per class. The remainder go
+        # to test.
+        n_samples = np.diff(offsets)
+        n_train_samples = n_samples - _n_test_samples(n_samples, test_size)
+        # Rank each sorted sample within its class; the first
+        # n_train_samples of each class are assigned to the training set.
+        class_id = np.repeat(np.arange(len(n_samples)), n_samples)
+        rank = np.arange(len(y)) - offsets[class_id]
+        is_train = rank < n_train_samples[class_id]
+        train_idx = sorted_idx[is_train]
+        test_idx = sorted_idx[~is_train]
         # Slice and dice.
         y_train, y_test = y[train_idx], y[test_idx]
         X_train, X_test = X[train_idx], X[test_idx]
 
+    if return_classes:
+        classes = y_sorted[offsets[:-1]] if stratify else np.unique(y)
+        return X_train, X_test, y_train, y_test, classes
+
     return X_train, X_test, y_train, y_test
 
-def batch_iterator(X, y=None, batch_size=None):
+def batch_iterator(X, y=None, batch_size=None, add_bias=False,
+                   reuse_buffer=False):
     """Batch generator.
     
     Creates an iterable of batches of the designated batch size.
@@ -915,6 +979,19 @@ def batch_iterator(X, y=None, batch_size=None):
     batch_size : None or int, optional (default=None)
         The number of observations to be included in each batch. 
 
+    add_bias : bool, optional (default=False)
+        If True, a bias column of ones is prepended to each batch of X so
+        that X itself need not carry the bias term. Unless reuse_buffer is
+        True, each dense batch is copied into a new array, which costs more
+        than slicing an X that already carries the bias term.
+
+    reuse_buffer : bool, optional (default=False)
+        Only used for dense X with add_bias=True. If True, every batch is
+        written into one scratch buffer whose bias column is filled once, so
+        no array is allocated per batch. The yielded batches alias that
+        buffer: each is only valid until the next batch is requested and
+        must be copied if it is to be kept.
+
     Returns
     -------
     array-like
@@ -925,11 +1002,33 @@ def batch_iterator(X, y=None, batch_size=None):
     n_samples = X.shape[0]
     if batch_size is None:
         batch_size = n_samples    
+    if isspmatrix_coo(X):
+        X = X.tocsr()
+    buffer = None
+    if add_bias and reuse_buffer and not issparse(X):
+        buffer = np.empty((min(batch_size, n_samples), X.shape[1] + 1),
+                          dtype=X.dtype)
+        buffer[:, 0] = 1.0
     for i in np.arange(0, n_samples, batch_size):
+        X_batch = X[i:i+batch_size]
+        if add_bias:
+            n_batch = X_batch.shape[0]
+            if issparse(X_batch):
+                bias_term = csr_matrix(np.ones((n_batch, 1)), dtype=float)
+                X_batch = hstack((bias_term, X_batch), format='csr')
+            else:
+                if buffer is not None:
+                    Xb = buffer[:n_batch]
+                else:
+                    Xb = np.empty((n_batch, X_batch.shape[1] + 1),
+                                  dtype=X_batch.dtype)
+                    Xb[:, 0] = 1.0
+                Xb[:, 1:] = X_batch
+                X_batch = Xb
         if y is not None:
-            yield X[i:i+batch_size], y[i:i+batch_size]
+            yield X_batch, y[i:i+batch_size]
         else:
-            yield X[i:i+batch_size]
+            yield X_batch
 
 def one_hot(x, n_classes=None, dtype='float32'):
     """Converts a vector of integers to one-hot encoding. 
@@ -951,23 +1050,18 @@ def one_hot(x, n_classes=None, dtype='float32'):
     A binary one-hot matrix representation of the input. The classes axis
     is placed last.
     """
-    x = np.array(x, dtype='int')
+    x = np.asarray(x, dtype=np.intp)
     if not n_classes:
-        n_classes = np.amax(x) + 1
-    one_hot = np.zeros((x.shape[0], n_classes))
-    one_hot[np.arange(x.shape[0]), x] = 1
-    return one_hot
+        n_classes = int(np.amax(x)) + 1
+    out = np.zeros((x.shape[0], n_classes), dtype=dtype)
+    out[np.arange(x.shape[0]), x] = 1
+    return out
 
 def todf(x, stub):
     """Converts nested array to dataframe."""
     n = len(x[0])
-    df = pd.DataFrame()
-    for i in range(n):
-        colname = stub + str(i)
-        vec = [item[i] for item in x]
-        df_vec = pd.DataFrame(vec, columns=[colname])
-        df = pd.concat([df, df_vec], axis=1)
-    return df  
+    columns = {stub + str(i): [item[i] for item in x] for i in range(n)}
+    return pd.DataFrame(columns)
 
 # ---------------------------------------------------------------------------- #
 # Dictionary search routine scarfed from https://stackoverflow.com/questions/9807634/find-all-occurrences-of-a-key-in-nested-dictionaries-and-lists
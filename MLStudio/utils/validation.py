@@ -107,10 +107,11 @@ def is_binary(x):
 # --------------------------------------------------------------------------  #
 def is_one_hot(x):
     """Returns true if a 2 dimensional matrix is in one-hot encoded format."""
-    if np.ndim(x) == 1:
+    x = np.asarray(x)
+    if x.ndim != 2 or x.dtype.kind not in 'biuf':
         return False
     try:
-        return np.sum(x) / x.shape[0]  == 1
+        return bool(((x == 0) | (x == 1)).all() and (x.sum(axis=1) == 1).all())
     except:
         return False
 # --------------------------------------------------------------------------  #
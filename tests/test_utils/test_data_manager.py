@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+# ============================================================================ #
+# Project : MLStudio                                                           #
+# Version : 0.1.0                                                              #
+# File    : test_data_manager.py                                               #
+# Python  : 3.8.2                                                              #
+# ---------------------------------------------------------------------------- #
+# Author  : John James                                                         #
+# Company : DecisionScients                                                    #
+# Email   : jjames@decisionscients.com                                         #
+# URL     : https://github.com/decisionscients/MLStudio                        #
+# ---------------------------------------------------------------------------- #
+# License : BSD                                                                #
+# Copyright (c) 2020 DecisionScients                                           #
+# ============================================================================ #
+"""Tests for data manager utilities."""
+import numpy as np
+import pytest
+
+from mlstudio.utils.data_manager import data_split, shuffle_data, sampler
+from mlstudio.utils.data_manager import StandardScaler, batch_iterator, hot_to_cool
+from mlstudio.utils.data_manager import MinMaxScaler, float_dtype
+from mlstudio.utils.validation import is_one_hot
+
+# --------------------------------------------------------------------------- #
+#                              DATA SPLIT                                     #
+# --------------------------------------------------------------------------- #
+class DataSplitTests:
+
+    def test_data_split_sizes(self):
+        # (n, test_size, n_test): 1 - 0.7 and 10 * 0.7 are not exact in
+        # floating point, so these guard against off-by-one splits.
+        cases = [(100, 0.3, 30), (100, 0.7, 70), (10, 0.7, 7), (100, 0.29, 29),
+                 (5, 0.5, 2), (7, 0.5, 3)]
+        for n, test_size, n_test in cases:
+            X = np.arange(2 * n).reshape(n, 2)
+            y = np.arange(n)
+            X_train, X_test, y_train, y_test = data_split(X, y, test_size=test_size)
+            msg = "n=%d, test_size=%s" % (n, test_size)
+            assert X_train.shape[0] == n - n_test, "Wrong training rows, " + msg
+            assert X_test.shape[0] == n_test, "Wrong test rows, " + msg
+            assert y_train.shape[0] == n - n_test, "Wrong training targets, " + msg
+            assert y_test.shape[0] == n_test, "Wrong test targets, " + msg
+
+    def test_data_split_sizes_match_stratified(self):
+        for n in (5, 7, 10, 100):
+            for test_size in (0.29, 0.3, 0.5, 0.7):
+                X = np.arange(n).reshape(-1, 1)
+                y = np.zeros(n)
+                _, X_test, _, _ = data_split(X, y, test_size=test_size)
+                _, X_test_s, _, _ = data_split(X, y, test_size=test_size,
+                                               stratify=True)
+                assert X_test.shape[0] == X_test_s.shape[0], \
+                    "Stratified and plain splits disagree for n=%d, " \
+                    "test_size=%s" % (n, test_size)
+
+    def test_data_split_stratified_class_sizes(self):
+        # Each class is split with the same rule as a plain split of its size.
+        y = np.repeat([0, 1, 2], [10, 100, 7])
+        X = np.arange(len(y)).reshape(-1, 1)
+        _, _, y_train, y_test = data_split(X, y, test_size=0.7, stratify=True)
+        assert np.array_equal(np.bincount(y_test), [7, 70, 4]), \
+            "Wrong per-class test counts"
+        assert np.array_equal(np.bincount(y_train), [3, 30, 3]), \
+            "Wrong per-class training counts"
+
+    def test_data_split_stratified_multiclass(self):
+        # Unequal, interleaved classes. Within each class the first
+        # ceil(n_k * (1 - test_size)) indices, in original order, go to
+        # training and the rest to test; classes are taken in sorted order.
+        y = np.array([2, 0, 1, 0, 2, 2, 1, 0, 0, 1])
+        X = np.arange(10).reshape(-1, 1)
+        expected = {0.3: ([1, 3, 7, 2, 6, 9, 0, 4, 5], [8]),
+                    0.5: ([1, 3, 2, 6, 0, 4], [7, 8, 9, 5])}
+        for test_size, (train_idx, test_idx) in expected.items():
+            X_train, X_test, y_train, y_test = data_split(X, y,
+                test_size=test_size, stratify=True)
+            assert np.array_equal(X_train.ravel(), train_idx), \
+                "Wrong training indices for test_size=%s" % test_size
+            assert np.array_equal(X_test.ravel(), test_idx), \
+                "Wrong test indices for test_size=%s" % test_size
+            assert np.array_equal(y_train, y[train_idx]), "y_train out of alignment"
+            assert np.array_equal(y_test, y[test_idx]), "y_test out of alignment"
+
+    def test_data_split_return_classes(self):
+        labels = [np.array([2, 0, 1, 0, 2, 2, 1, 0, 0, 1]),
+                  np.array(['b', 'a', 'c', 'a', 'b', 'b', 'c', 'a', 'a', 'c'])]
+        X = np.arange(10).reshape(-1, 1)
+        for y in labels:
+            for stratify in (False, True):
+                result = data_split(X, y, stratify=stratify,
+                                    return_classes=True)
+                assert len(result) == 5, "Classes not returned"
+                assert np.array_equal(result[4], np.unique(y)), \
+                    "Wrong classes for stratify=%s, dtype=%s" % (stratify, y.dtype)
+
+# --------------------------------------------------------------------------- #
+#                              SHUFFLE DATA                                   #
+# --------------------------------------------------------------------------- #
+class ShuffleDataTests:
+
+    def test_shuffle_data_keeps_X_y_aligned(self):
+        X = np.arange(100).reshape(50, 2)
+        y = X[:, 0] * 10
+        X_s, y_s = shuffle_data(X, y, random_state=5)
+        assert not np.array_equal(X, X_s), "Data was not shuffled"
+        assert np.array_equal(X_s[:, 0] * 10, y_s), "X and y out of alignment"
+        assert np.array_equal(np.sort(X_s[:, 0]), X[:, 0]), "Rows lost or duplicated"
+
+    def test_shuffle_data_array_like(self):
+        X_s, y_s = shuffle_data([1, 2, 3], [1, 2, 3], random_state=5)
+        assert np.array_equal(X_s, y_s), "X and y out of alignment"
+
+    def test_shuffle_data_random_state(self):
+        X = np.arange(50)
+        X_1, _ = shuffle_data(X, random_state=5)
+        X_2, _ = shuffle_data(X, random_state=5)
+        assert np.array_equal(X_1, X_2), "Same random_state gave different shuffles"
+
+# --------------------------------------------------------------------------- #
+#                                SAMPLER                                      #
+# --------------------------------------------------------------------------- #
+class SamplerTests:
+
+    def test_sampler_without_replacement(self):
+        X = np.arange(100).reshape(50, 2)
+        y = X[:, 0]
+        X_s, y_s = sampler(X, y, size=50, replace=False, random_state=5)
+        assert len(np.unique(y_s)) == 50, "Sampling without replacement repeated rows"
+        assert np.array_equal(X_s[:, 0], y_s), "X and y out of alignment"
+
+    def test_sampler_with_replacement(self):
+        X = np.arange(10).reshape(10, 1)
+        y = np.arange(10)
+        X_s, y_s = sampler(X, y, size=100, replace=True, random_state=5)
+        assert X_s.shape[0] == 100, "Sample size not honored"
+        assert np.array_equal(X_s[:, 0], y_s), "X and y out of alignment"
+
+    def test_sampler_random_state(self):
+        X = np.arange(100).reshape(50, 2)
+        y = X[:, 0]
+        _, y_1 = sampler(X, y, size=20, random_state=5)
+        _, y_2 = sampler(X, y, size=20, random_state=5)
+        assert np.array_equal(y_1, y_2), "Same random_state gave different samples"
+
+# --------------------------------------------------------------------------- #
+#                            STANDARD SCALER                                  #
+# --------------------------------------------------------------------------- #
+class StandardScalerTests:
+
+    def test_standard_scaler_constant_feature(self):
+        X = np.column_stack((np.full(20, 3.0), np.arange(20.0)))
+        X_t = StandardScaler().fit_transform(X)
+        assert np.all(np.isfinite(X_t)), "Constant feature produced inf or nan"
+        assert np.allclose(X_t[:, 0], 0), "Constant feature not centered to zero"
+        assert np.isclose(np.std(X_t[:, 1]), 1), "Feature not scaled to unit variance"
+
+# --------------------------------------------------------------------------- #
+#                              SCALER DTYPE                                   #
+# --------------------------------------------------------------------------- #
+class ScalerDtypeTests:
+
+    def test_float_dtype(self):
+        assert float_dtype(np.ones(3, dtype=np.float32)) == np.float32, \
+            "float32 input not preserved"
+        assert float_dtype(np.ones(3, dtype=np.int64)) == np.float64, \
+            "Integer input not promoted to float64"
+        assert float_dtype(np.ones(3), dtype=np.float32) == np.float32, \
+            "Explicit dtype not honored"
+
+    def test_scaler_dtype(self):
+        X = np.arange(20).reshape(10, 2)
+        for scaler in (MinMaxScaler, StandardScaler):
+            name = scaler.__name__
+            X_t = scaler().fit_transform(X.astype(np.float32))
+            assert X_t.dtype == np.float32, "%s did not keep float32" % name
+            X_t = scaler().fit_transform(X)
+            assert X_t.dtype == np.float64, "%s did not promote int to float64" % name
+            X_t = scaler(dtype=np.float32).fit_transform(X.astype(np.float64))
+            assert X_t.dtype == np.float32, "%s ignored explicit dtype" % name
+            X_t = scaler(dtype=np.float64).fit_transform(X.astype(np.float32))
+            assert X_t.dtype == np.float64, "%s ignored explicit dtype" % name
+
+# --------------------------------------------------------------------------- #
+#                            BATCH ITERATOR                                   #
+# --------------------------------------------------------------------------- #
+class BatchIteratorTests:
+
+    def test_batch_iterator_add_bias_retained_batches(self):
+        X = np.arange(20.0).reshape(10, 2)
+        batches = list(batch_iterator(X, batch_size=4, add_bias=True))
+        X_b = np.vstack(batches)
+        assert np.all(X_b[:, 0] == 1), "Bias column not added"
+        assert np.array_equal(X_b[:, 1:], X), "Retained batches were overwritten"
+
+    def test_batch_iterator_add_bias_reuse_buffer(self):
+        X = np.arange(20.0).reshape(10, 2)
+        y = np.arange(10)
+        batches = []
+        for X_batch, y_batch in batch_iterator(X, y, batch_size=4,
+                                               add_bias=True, reuse_buffer=True):
+            assert np.all(X_batch[:, 0] == 1), "Bias column not added"
+            assert np.array_equal(X_batch[:, 1:], X[y_batch]), "Wrong batch data"
+            batches.append(X_batch)
+        # Every batch is a view of the same scratch buffer.
+        assert all(np.shares_memory(b, batches[0]) for b in batches), \
+            "Scratch buffer was not reused"
+
+# --------------------------------------------------------------------------- #
+#                              HOT TO COOL                                    #
+# --------------------------------------------------------------------------- #
+class HotToCoolTests:
+
+    def test_hot_to_cool_one_hot(self):
+        y = np.array([[1, 0, 0], [0, 0, 1], [0, 1, 0]])
+        assert is_one_hot(y), "One-hot matrix not recognized"
+        assert np.array_equal(hot_to_cool(y), [0, 2, 1]), "Wrong class indices"
+
+    def test_hot_to_cool_soft_labels(self):
+        y = np.array([[0.5, 0.5], [0.3, 0.7]])
+        assert not is_one_hot(y), "Soft labels treated as one-hot"
+        assert np.array_equal(hot_to_cool(y), y), "Soft labels were collapsed"
+
+    def test_hot_to_cool_not_one_hot(self):
+        y = np.array([[2, 0], [0, 0]])
+        assert not is_one_hot(y), "Integer matrix treated as one-hot"
+        assert np.array_equal(hot_to_cool(y), y), "Integer matrix was collapsed"